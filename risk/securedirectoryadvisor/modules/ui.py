@@ -8,14 +8,7 @@ import os
 import platform
 import threading
 import tkinter as tk
-from tkinter import filedialog, font as tkfont, messagebox
-
-try:
-    import send2trash as _send2trash
-    _SEND2TRASH_AVAILABLE = True
-except ImportError:
-    _send2trash = None
-    _SEND2TRASH_AVAILABLE = False
+from tkinter import font as tkfont, messagebox
 
 from modules.analyzer import analyze_file, analyze_url, format_file_size, RISK_SAFE, RISK_CAUTION, RISK_DANGER
 from modules.contact import compose_message, open_mailto
@@ -65,6 +58,22 @@ RISK_COLOURS = {
 
 
 class SafetyAdvisorApp:
+    # send2trash is optional and only needed when the user deletes a file,
+    # so the import is deferred until then and cached at class level.
+    _send2trash_mod = None
+    _send2trash_checked = False
+
+    @classmethod
+    def _get_send2trash(cls):
+        if not cls._send2trash_checked:
+            cls._send2trash_checked = True
+            try:
+                import send2trash
+            except ImportError:
+                send2trash = None
+            cls._send2trash_mod = send2trash
+        return cls._send2trash_mod
+
     def __init__(self, root: tk.Tk, config):
         self.root = root
         self.config = config
@@ -73,14 +82,25 @@ class SafetyAdvisorApp:
         self._settings_scroll_canvas: tk.Canvas | None = None
         self._platform = platform.system()
         self._status_clear_id: str | None = None
+        self._scrollregion_after_id: str | None = None
+        self._findings_total_h = 0
+        # Bound method cached once so wheel handlers skip the attribute lookup.
+        self._scroll = self._scroll_active_canvas
         self._setup_fonts()
+        self._register_hover_classes()
         self._build_window()
 
     # ------------------------------------------------------------------
     # Font setup
     # ------------------------------------------------------------------
     def _setup_fonts(self):
+        """Create the shared named-Font objects used by every widget.
+
+        All widgets reference these tkfont.Font instances (never raw family
+        tuples), so Tk resolves each font id once and .measure() metric
+        queries stay cheap."""
         base = 15  # Larger base for accessibility
+        self._font_families = {name.lower(): name for name in tkfont.families()}
         ui_family = self._pick_font_family("Trebuchet MS", "Segoe UI", "Calibri", "Verdana")
         title_family = self._pick_font_family("Book Antiqua", "Georgia", "Constantia", ui_family)
         self.font_title = tkfont.Font(family=title_family, size=base + 6, weight="bold")
@@ -92,9 +112,8 @@ class SafetyAdvisorApp:
         self.font_tab = tkfont.Font(family=ui_family, size=base - 1, weight="bold")
 
     def _pick_font_family(self, *choices: str) -> str:
-        available = {name.lower(): name for name in tkfont.families()}
         for choice in choices:
-            match = available.get(choice.lower())
+            match = self._font_families.get(choice.lower())
             if match:
                 return match
         return "TkDefaultFont"
@@ -319,6 +338,7 @@ class SafetyAdvisorApp:
         return page
 
     def _on_browse_file(self):
+        from tkinter import filedialog  # deferred: pulls in platform dialog machinery
         filepath = filedialog.askopenfilename(
             title="Select a file to check",
             parent=self.root
@@ -739,36 +759,64 @@ class SafetyAdvisorApp:
         return page
 
     def _flash_save_confirmation(self, label: tk.Label, text: str = "Saved ✓"):
-        """Briefly show a green confirmation next to a save button, then fade it."""
-        label.configure(text=text)
+        """Briefly show a green confirmation next to a save button, then fade it.
+
+        Rapid clicks reschedule the single pending timer instead of piling up
+        one `after` callback per click; the label's text goes through a reused
+        StringVar so repeated flashes don't churn Tcl string objects."""
+        pending = getattr(label, "_clear_after_id", None)
+        if pending is not None:
+            self.root.after_cancel(pending)
+        var = getattr(label, "_flash_var", None)
+        if var is None:
+            var = tk.StringVar(master=label)
+            label._flash_var = var
+            label.configure(textvariable=var)
+        var.set(text)
+
         def clear():
+            label._clear_after_id = None
             try:
-                label.configure(text="")
+                var.set("")
             except tk.TclError:
                 pass
-        self.root.after(3000, clear)
+
+        label._clear_after_id = self.root.after(3000, clear)
 
     def _save_contact(self):
-        with self.config.batch_update():
-            self.config.trusted_contact_name  = self._contact_name_var.get().strip()
-            self.config.trusted_contact_email = self._contact_email_var.get().strip()
+        name  = self._contact_name_var.get().strip()
+        email = self._contact_email_var.get().strip()
+        # Only touch the config (and its file on disk) when something changed.
+        if (name != self.config.trusted_contact_name
+                or email != self.config.trusted_contact_email):
+            with self.config.batch_update():
+                self.config.trusted_contact_name  = name
+                self.config.trusted_contact_email = email
         self._flash_save_confirmation(self._contact_save_label, "✅  Contact saved!")
         self._set_status_temp("Trusted contact saved ✓")
 
     def _browse_dl_folder(self):
+        from tkinter import filedialog  # deferred: pulls in platform dialog machinery
         folder = filedialog.askdirectory(title="Select your Downloads folder", parent=self.root)
-        if folder:
+        # Guard the set() so var traces and Entry redraws only fire on change.
+        if folder and folder != self._dl_folder_var.get():
             self._dl_folder_var.set(folder)
 
     def _save_dl_folder(self):
-        self.config.downloads_folder = self._dl_folder_var.get().strip()
+        folder = self._dl_folder_var.get().strip()
+        if folder != self.config.downloads_folder:
+            self.config.downloads_folder = folder
         self._flash_save_confirmation(self._dl_save_label, "✅  Folder saved! Restart to apply.")
         self._set_status_temp("Downloads folder saved ✓ (restart the app to apply)")
 
     def _save_api_keys(self):
-        with self.config.batch_update():
-            self.config.virustotal_api_key       = self._vt_key_var.get().strip()
-            self.config.google_safe_browsing_key = self._gsb_key_var.get().strip()
+        vt_key  = self._vt_key_var.get().strip()
+        gsb_key = self._gsb_key_var.get().strip()
+        if (vt_key != self.config.virustotal_api_key
+                or gsb_key != self.config.google_safe_browsing_key):
+            with self.config.batch_update():
+                self.config.virustotal_api_key       = vt_key
+                self.config.google_safe_browsing_key = gsb_key
         self._flash_save_confirmation(self._api_save_label, "✅  Keys saved successfully!")
         self._set_status_temp("API keys saved ✓")
 
@@ -818,10 +866,26 @@ class SafetyAdvisorApp:
             canvas.itemconfig(canvas_window, width=e.width)
         canvas.bind("<Configure>", _on_resize)
 
-        def _on_frame_configure(e):
-            canvas.configure(scrollregion=canvas.bbox("all"))
+        # Scrollregion is computed from the frame's requested height rather
+        # than bbox("all"), which walks every canvas item on the Tcl side and
+        # fires for each card during initial layout.  Resize bursts are
+        # debounced so we reconfigure at most once per 50 ms.
+        def _update_scrollregion():
+            self._scrollregion_after_id = None
+            try:
+                canvas.configure(
+                    scrollregion=(0, 0, canvas.winfo_width(), inner.winfo_reqheight())
+                )
+            except tk.TclError:
+                pass
+
+        def _on_frame_configure(_e):
+            if self._scrollregion_after_id is not None:
+                self.root.after_cancel(self._scrollregion_after_id)
+            self._scrollregion_after_id = self.root.after(50, _update_scrollregion)
         inner.bind("<Configure>", _on_frame_configure)
 
+        self._findings_total_h = 0
         for finding in result.get("findings", []):
             frisk = finding.get("risk", RISK_CAUTION)
             ffg, fbg, _ = RISK_COLOURS.get(frisk, (COLOURS["caution"], COLOURS["caution_bg"], ""))
@@ -837,14 +901,24 @@ class SafetyAdvisorApp:
                 pady=12,
             )
             card.pack(fill="x", pady=4, padx=4)
-            self._wrap_label(
-                card, text=finding["title"],
-                font=self.font_heading, fg=ffg, bg=fbg,
-            ).pack(fill="x")
-            self._wrap_label(
-                card, text=finding["detail"],
+            # One label per finding (title + detail) halves the widget count
+            # and <Configure> bindings versus separate title/detail labels;
+            # the card's own resize drives the shared wraplength.
+            lbl = tk.Label(
+                card, text=f"{finding['title']}\n{finding['detail']}",
                 font=self.font_body, fg=COLOURS["text"], bg=fbg,
-            ).pack(fill="x", pady=(6, 0))
+                anchor="w", justify="left",
+            )
+            lbl.pack(fill="x")
+            card.bind(
+                "<Configure>",
+                lambda e, l=lbl: l.configure(wraplength=max(100, e.width - 40)),
+            )
+            self._findings_total_h += card.winfo_reqheight() + 8
+
+        # Set the scrollregion once from the running height sum; the debounced
+        # <Configure> handler keeps it in sync on later resizes.
+        canvas.configure(scrollregion=(0, 0, canvas.winfo_width(), self._findings_total_h))
 
         # Action buttons in an industrial prompt shell.
         action_card = self._prompt_card(container, "What would you like to do next?")
@@ -853,7 +927,7 @@ class SafetyAdvisorApp:
 
         filepath = result.get("filepath")
         if risk == RISK_DANGER and filepath and os.path.isfile(filepath):
-            delete_label = "🗑️  Move to Recycle Bin" if _SEND2TRASH_AVAILABLE else "🗑️  Delete File"
+            delete_label = "🗑️  Move to Recycle Bin" if self._get_send2trash() else "🗑️  Delete File"
             self._make_button(
                 action_frame,
                 delete_label,
@@ -888,7 +962,8 @@ class SafetyAdvisorApp:
 
     def _delete_file(self, filepath: str, container: tk.Frame):
         filename = os.path.basename(filepath)
-        if _SEND2TRASH_AVAILABLE:
+        send2trash = self._get_send2trash()
+        if send2trash:
             action_verb = "send this file to the Recycle Bin"
             undo_note = "You can restore it from the Recycle Bin later if needed."
         else:
@@ -903,8 +978,8 @@ class SafetyAdvisorApp:
         if not confirmed:
             return
         try:
-            if _SEND2TRASH_AVAILABLE:
-                _send2trash.send2trash(filepath)
+            if send2trash:
+                send2trash.send2trash(filepath)
                 done_msg = f"'{filename}' has been moved to the Recycle Bin. ✓"
             else:
                 os.remove(filepath)
@@ -1031,21 +1106,24 @@ class SafetyAdvisorApp:
 
     def _on_mousewheel_darwin(self, event):
         if event.delta:
-            self._scroll_active_canvas(-int(event.delta))
+            self._scroll(-int(event.delta))
 
     def _on_mousewheel_windows(self, event):
-        if event.delta == 0:
+        # Hot path on rapid trackpad scrolling: floor-divide keeps this in
+        # integer arithmetic (no float allocation per event).
+        delta = event.delta
+        if delta == 0:
             return
-        units = -int(event.delta / 120)
+        units = -(delta // 120)
         if units == 0:
-            units = -1 if event.delta > 0 else 1
-        self._scroll_active_canvas(units)
+            units = -1 if delta > 0 else 1
+        self._scroll(units)
 
     def _on_mousewheel_linux_up(self, _event):
-        self._scroll_active_canvas(-1)
+        self._scroll(-1)
 
     def _on_mousewheel_linux_down(self, _event):
-        self._scroll_active_canvas(1)
+        self._scroll(1)
 
     def _wrap_label(self, parent, text: str, font, fg: str, bg: str,
                     anchor="w", justify="left", padding: int = 40, **kwargs) -> tk.Label:
@@ -1129,6 +1207,27 @@ class SafetyAdvisorApp:
         ).pack(fill="x", pady=(0, 4))
         return card
 
+    def _register_hover_classes(self):
+        """Register one hover <Enter>/<Leave> binding per button tone.
+
+        Buttons opt in via a ``HoverBtn_<tone>`` bindtag instead of carrying
+        two lambda closures each, so hover handling stays O(1) per tone no
+        matter how many buttons a page creates."""
+        for tone in ("primary", "coast", "industrial"):
+            base_bg, hover_bg = self._resolve_button_tone(tone)
+            self.root.bind_class(
+                f"HoverBtn_{tone}", "<Enter>",
+                lambda e, bg=hover_bg: e.widget.configure(bg=bg),
+            )
+            self.root.bind_class(
+                f"HoverBtn_{tone}", "<Leave>",
+                lambda e, bg=base_bg: e.widget.configure(bg=bg),
+            )
+
+    def _apply_hover_tag(self, btn: tk.Button, tone: str):
+        tags = btn.bindtags()
+        btn.bindtags((tags[0], f"HoverBtn_{tone}", *tags[1:]))
+
     def _resolve_button_tone(self, tone: str) -> tuple[str, str]:
         if tone == "coast":
             return COLOURS["coast"], COLOURS["accent"]
@@ -1153,8 +1252,7 @@ class SafetyAdvisorApp:
             cursor="hand2",
             command=command
         )
-        btn.bind("<Enter>", lambda _e: btn.configure(bg=hover_bg))
-        btn.bind("<Leave>", lambda _e: btn.configure(bg=base_bg))
+        self._apply_hover_tag(btn, tone)
         return btn
 
     def _make_button(self, parent, text: str, command, tone: str = "primary") -> tk.Button:
@@ -1173,8 +1271,7 @@ class SafetyAdvisorApp:
             cursor="hand2",
             command=command
         )
-        btn.bind("<Enter>", lambda _e: btn.configure(bg=hover_bg))
-        btn.bind("<Leave>", lambda _e: btn.configure(bg=base_bg))
+        self._apply_hover_tag(btn, tone)
         return btn
 
     def _build_statusbar(self):
@@ -1,17 +1,55 @@
 import json
+import pickle
+import queue
+import re
 import time
+from hashlib import blake2b
+from itertools import islice
 import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import os
 from pathlib import Path
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import LFUCache
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Timestamp strings cached per wall-clock second: context entries, history
+# records, and log lines all format the current time far more often than the
+# second actually changes
+_ts_cache = [0, "", "", ""]
+
+
+def _now_strings():
+    """Return (isoformat, log timestamp, yyyymmdd) strings for now, cached at
+    second resolution"""
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        dt = datetime.fromtimestamp(t)
+        _ts_cache[0] = t
+        _ts_cache[1] = dt.isoformat()
+        _ts_cache[2] = dt.strftime("%Y-%m-%d %H:%M:%S")
+        _ts_cache[3] = dt.strftime("%Y%m%d")
+    return _ts_cache[1], _ts_cache[2], _ts_cache[3]
+
 class AIAgent:
+    # Token sets for the fast-path chat/fallback branches; one tokenize plus
+    # set intersections replaces repeated substring scans of the message
+    _WORD_RE = re.compile(r"[a-z]+")
+    _GREETING_WORDS = frozenset({"hello", "hi", "hey"})
+    _STATUS_WORDS = frozenset({"status", "monitoring"})
+    _HELP_WORDS = frozenset({"help"})
+    _THREAT_WORDS = frozenset({"threat", "alert"})
+    _SECURITY_WORDS = frozenset({"security", "threat"})
+    _CREDENTIAL_WORDS = frozenset({"password", "login"})
+    _MALWARE_WORDS = frozenset({"virus", "malware"})
+
     def __init__(self):
         self.context_memory = []
         self.user_preferences = {}
@@ -20,12 +58,35 @@ class AIAgent:
         self.max_context_length = 50
         self.max_conversation_length = 100
         self.model_loaded = False
-        self.response_cache = {}
+        # LFU keeps hot prompts (status/help templates) resident; keys are
+        # stable blake2b digests so the cache can be persisted across runs
+        self.response_cache = LFUCache(maxsize=256)
+
+        # Semantic cache (L2 behind the exact-hash cache): paraphrased prompts
+        # hit cached responses when cosine similarity clears the threshold
+        self.embed_model = None  # loaded lazily on first use
+        self._embed_unavailable = False
+        self.cache_embeds = np.zeros((0, 384), np.float32)
+        self.cache_values = []
+        self.semantic_threshold = 0.92
+        self.max_semantic_entries = 256
         
         # LLM Configuration
         self.llm_provider = os.getenv('LLM_PROVIDER', 'openai')  # 'openai' or 'ollama'
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.ollama_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
+
+        # Pooled HTTP session so repeated LLM calls reuse TCP/TLS connections
+        # instead of paying a fresh handshake per prompt
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        self.http.headers.update({"Content-Type": "application/json"})
         
         # Agent personality and capabilities
         self.agent_personality = """
@@ -55,10 +116,18 @@ class AIAgent:
         # Create logs directory
         self.logs_dir = Path(__file__).parent / 'logs'
         self.logs_dir.mkdir(exist_ok=True)
+
+        # Log records are queued to one background writer that keeps the
+        # file handle open and flushes in batches, instead of an
+        # open/write/close syscall triplet per event
+        self._log_q = queue.Queue()
+        threading.Thread(target=self._log_writer, daemon=True).start()
         
     def start_agent(self):
         """Start the AI agent"""
         self.is_active = True
+        # Warm the response cache from the previous run
+        self._load_response_cache()
         # Pre-load the model for faster responses
         if self.llm_provider == 'ollama' and not self.model_loaded:
             try:
@@ -72,16 +141,20 @@ class AIAgent:
     def _preload_model(self):
         """Pre-load the model to keep it in memory"""
         try:
+            # Same system prompt as real calls so the preload warms the
+            # prefix KV cache the later calls will reuse
             data = {
                 "model": "llama3.2",
                 "prompt": "test",
+                "system": self.agent_personality,
+                "keep_alive": "30m",
                 "stream": False,
                 "options": {
                     "num_predict": 1
                 }
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.ollama_url}/api/generate",
                 json=data,
                 timeout=10
@@ -96,13 +169,38 @@ class AIAgent:
     def stop_agent(self):
         """Stop the AI agent"""
         self.is_active = False
+        self._save_response_cache()
         self.log_event("AI Agent stopped")
         return {"success": True, "message": "AI Agent stopped successfully"}
+
+    def _load_response_cache(self):
+        """Reload the persisted response cache from the previous run, if any"""
+        cache_file = self.logs_dir / 'response_cache.pkl'
+        if not cache_file.exists():
+            return
+        try:
+            with open(cache_file, 'rb') as f:
+                for key, value in pickle.load(f).items():
+                    self.response_cache[key] = value
+            self.log_event(f"Response cache reloaded ({len(self.response_cache)} entries)")
+        except Exception as e:
+            self.log_event(f"Response cache reload failed: {str(e)}")
+
+    def _save_response_cache(self):
+        """Persist the response cache to disk; the blake2b keys are stable
+        across processes. Oversized responses are skipped to keep restart
+        I/O small"""
+        try:
+            entries = {k: v for k, v in self.response_cache.items() if len(v) < 4096}
+            with open(self.logs_dir / 'response_cache.pkl', 'wb') as f:
+                pickle.dump(entries, f)
+        except Exception as e:
+            self.log_event(f"Response cache save failed: {str(e)}")
     
     def add_context(self, context_data: Dict[str, Any]):
         """Add context information to memory"""
         context_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_strings()[0],
             "data": context_data
         }
         
@@ -131,7 +229,7 @@ class AIAgent:
                 "success": True,
                 "analysis": analysis,
                 "suggestions": suggestions,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_strings()[0]
             }
             
         except Exception as e:
@@ -145,7 +243,7 @@ class AIAgent:
             self.conversation_history.append({
                 "role": "user",
                 "content": user_message,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_strings()[0]
             })
             
             # Generate AI response
@@ -155,7 +253,7 @@ class AIAgent:
             self.conversation_history.append({
                 "role": "assistant",
                 "content": ai_response,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_strings()[0]
             })
             
             # Keep conversation history manageable
@@ -165,7 +263,7 @@ class AIAgent:
             return {
                 "success": True,
                 "response": ai_response,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_strings()[0]
             }
             
         except Exception as e:
@@ -195,22 +293,25 @@ Analysis: {analysis}
 Provide 2 specific, actionable security recommendations. Keep each under 10 words."""
         
         response = self._call_llm(prompt)
-        # Parse suggestions from response
-        suggestions = [s.strip() for s in response.split('\n') if s.strip() and not s.startswith('#') and len(s.strip()) > 5]
-        return suggestions[:2]  # Limit to 2 suggestions
+        # Parse suggestions in one pass, stopping once two have been kept
+        return list(islice(
+            (stripped for line in response.splitlines()
+             if (stripped := line.strip()) and not stripped.startswith('#') and len(stripped) > 5),
+            2
+        ))
     
     def _generate_chat_response(self, user_message: str) -> str:
         """Generate a response to user chat"""
-        user_lower = user_message.lower()
+        words = frozenset(self._WORD_RE.findall(user_message.lower()))
         
         # Fast responses for common queries
-        if any(word in user_lower for word in ["hello", "hi", "hey"]):
+        if words & self._GREETING_WORDS:
             return "AwakenSecurity AI online. How can I assist with your security analysis?"
-        elif "status" in user_lower or "monitoring" in user_lower:
+        elif words & self._STATUS_WORDS:
             return "Security monitoring is operational. All systems are active and protecting your device."
-        elif "help" in user_lower:
+        elif words & self._HELP_WORDS:
             return "I can analyze security threats, review alerts, and provide recommendations. What would you like to know?"
-        elif "threat" in user_lower or "alert" in user_lower:
+        elif words & self._THREAT_WORDS:
             return "I can review detected threats and provide analysis. Check the alerts panel for recent security events."
         
         # For more complex queries, use LLM
@@ -220,13 +321,58 @@ Keep response under 100 words. Be professional and technical."""
         
         return self._call_llm(prompt)
     
+    def _embed_prompt(self, prompt: str):
+        """Embed a prompt for the semantic cache (None if encoder unavailable)"""
+        if self._embed_unavailable:
+            return None
+        if self.embed_model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self.embed_model = SentenceTransformer('all-MiniLM-L6-v2')
+            except Exception as e:
+                self._embed_unavailable = True
+                self.log_event(f"Semantic cache disabled (encoder unavailable): {str(e)}")
+                return None
+        try:
+            return self.embed_model.encode([prompt], normalize_embeddings=True)[0].astype(np.float32)
+        except Exception as e:
+            self.log_event(f"Prompt embedding failed: {str(e)}")
+            return None
+
+    def _semantic_cache_lookup(self, embedding) -> Optional[str]:
+        """Return a cached response for a semantically similar prompt, if any"""
+        if embedding is None or self.cache_embeds.shape[0] == 0:
+            return None
+        sims = self.cache_embeds @ embedding
+        best = int(sims.argmax())
+        if sims[best] >= self.semantic_threshold:
+            return self.cache_values[best]
+        return None
+
+    def _semantic_cache_store(self, embedding, response: str):
+        """Append an (embedding, response) pair with FIFO eviction"""
+        if embedding is None:
+            return
+        self.cache_embeds = np.vstack([self.cache_embeds, embedding[None, :]])
+        self.cache_values.append(response)
+        if self.cache_embeds.shape[0] > self.max_semantic_entries:
+            self.cache_embeds = self.cache_embeds[1:]
+            self.cache_values.pop(0)
+
     def _call_llm(self, prompt: str) -> str:
         """Call the configured LLM provider"""
-        # Check cache first
-        cache_key = hash(prompt)
+        # Check exact-match cache first
+        cache_key = blake2b(prompt.encode(), digest_size=16).digest()
         if cache_key in self.response_cache:
             return self.response_cache[cache_key]
-        
+
+        # Then the semantic cache, so paraphrased prompts still hit
+        embedding = self._embed_prompt(prompt)
+        cached = self._semantic_cache_lookup(embedding)
+        if cached is not None:
+            self.response_cache[cache_key] = cached
+            return cached
+
         try:
             if self.llm_provider == 'openai' and self.openai_api_key:
                 response = self._call_openai(prompt)
@@ -236,15 +382,9 @@ Keep response under 100 words. Be professional and technical."""
                 # Fallback response if no LLM is configured
                 response = self._fallback_response(prompt)
             
-            # Cache the response
+            # Cache the response; LFUCache evicts cold entries on its own
             self.response_cache[cache_key] = response
-            
-            # Keep cache size manageable
-            if len(self.response_cache) > 50:
-                # Remove oldest entries
-                oldest_keys = list(self.response_cache.keys())[:10]
-                for key in oldest_keys:
-                    del self.response_cache[key]
+            self._semantic_cache_store(embedding, response)
             
             return response
                 
@@ -252,38 +392,59 @@ Keep response under 100 words. Be professional and technical."""
             self.log_event(f"LLM call failed: {str(e)}")
             return "I'm having trouble processing that right now. Please try again."
     
-    def _call_openai(self, prompt: str) -> str:
-        """Call OpenAI API"""
+    def _stream_openai(self, prompt: str):
+        """Stream completion tokens from the OpenAI API"""
         headers = {
             "Authorization": f"Bearer {self.openai_api_key}",
             "Content-Type": "application/json"
         }
-        
+
         data = {
             "model": "gpt-3.5-turbo",
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": [
+                {"role": "system", "content": self.agent_personality},
+                {"role": "user", "content": prompt}
+            ],
             "max_tokens": 500,
-            "temperature": 0.7
+            "temperature": 0.7,
+            "stream": True
         }
-        
-        response = requests.post(
+
+        with self.http.post(
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
             json=data,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"]
-        else:
-            raise Exception(f"OpenAI API error: {response.status_code}")
-    
-    def _call_ollama(self, prompt: str) -> str:
-        """Call local Ollama instance"""
+            timeout=60,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"OpenAI API error: {response.status_code}")
+            for line in response.iter_lines():
+                if not line or not line.startswith(b"data: "):
+                    continue
+                payload = line[6:]
+                if payload == b"[DONE]":
+                    break
+                chunk = json.loads(payload)
+                delta = chunk["choices"][0].get("delta", {})
+                content = delta.get("content")
+                if content:
+                    yield content
+
+    def _call_openai(self, prompt: str) -> str:
+        """Call OpenAI API (joins the streamed tokens)"""
+        return "".join(self._stream_openai(prompt))
+
+    def _stream_ollama(self, prompt: str):
+        """Stream completion tokens from the local Ollama instance"""
         data = {
             "model": "llama3.2",
             "prompt": prompt,
-            "stream": False,
+            # Static system prefix + keep_alive let Ollama keep the model and
+            # the shared prompt KV cache resident between calls
+            "system": self.agent_personality,
+            "keep_alive": "30m",
+            "stream": True,
             "options": {
                 "temperature": 0.3,
                 "top_p": 0.9,
@@ -292,32 +453,100 @@ Keep response under 100 words. Be professional and technical."""
                 "stop": ["\n\n", "User:", "Human:", "Assistant:"]
             }
         }
-        
-        response = requests.post(
+
+        with self.http.post(
             f"{self.ollama_url}/api/generate",
             json=data,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            return response.json()["response"].strip()
-        else:
-            raise Exception(f"Ollama API error: {response.status_code}")
+            timeout=30,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"Ollama API error: {response.status_code}")
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response")
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    break
+
+    def _call_ollama(self, prompt: str) -> str:
+        """Call local Ollama instance (joins the streamed tokens)"""
+        return "".join(self._stream_ollama(prompt)).strip()
+
+    def stream_chat(self, user_message: str):
+        """Stream a chat response token by token.
+
+        Yields text chunks as the provider produces them so callers can show
+        output at time-to-first-token instead of waiting for the full
+        completion; the finished response is recorded in the conversation
+        history and caches like chat_with_user."""
+        self.conversation_history.append({
+            "role": "user",
+            "content": user_message,
+            "timestamp": _now_strings()[0]
+        })
+
+        prompt = f"""You are AwakenSecurity AI. Respond to: "{user_message}"
+
+Keep response under 100 words. Be professional and technical."""
+
+        cache_key = blake2b(prompt.encode(), digest_size=16).digest()
+        cached = self.response_cache.get(cache_key)
+        parts = []
+        completed = True
+        try:
+            if cached is not None:
+                parts.append(cached)
+                yield cached
+            elif self.llm_provider == 'openai' and self.openai_api_key:
+                for token in self._stream_openai(prompt):
+                    parts.append(token)
+                    yield token
+            elif self.llm_provider == 'ollama':
+                for token in self._stream_ollama(prompt):
+                    parts.append(token)
+                    yield token
+            else:
+                fallback = self._fallback_response(prompt)
+                parts.append(fallback)
+                yield fallback
+        except Exception as e:
+            # Don't let a broken stream into parts: caching partial tokens
+            # plus the apology would poison the exact-match cache (and its
+            # on-disk copy) for this prompt
+            completed = False
+            self.log_event(f"Streaming chat failed: {str(e)}")
+            yield "I'm having trouble processing that right now. Please try again."
+
+        ai_response = "".join(parts).strip()
+        if completed and ai_response:
+            if cached is None:
+                self.response_cache[cache_key] = ai_response
+            self.conversation_history.append({
+                "role": "assistant",
+                "content": ai_response,
+                "timestamp": _now_strings()[0]
+            })
+            if len(self.conversation_history) > self.max_conversation_length:
+                self.conversation_history = self.conversation_history[-self.max_conversation_length:]
     
     def _fallback_response(self, prompt: str) -> str:
         """Fallback response when no LLM is available"""
-        prompt_lower = prompt.lower()
+        words = frozenset(self._WORD_RE.findall(prompt.lower()))
         
         # Fast template responses for common queries
-        if "security" in prompt_lower or "threat" in prompt_lower:
+        if words & self._SECURITY_WORDS:
             return "Security monitoring is active. I can analyze detected threats and provide recommendations."
-        elif "help" in prompt_lower:
+        elif words & self._HELP_WORDS:
             return "I can analyze security threats, provide technical insights, and offer actionable recommendations for your digital safety."
-        elif "status" in prompt_lower or "monitoring" in prompt_lower:
+        elif words & self._STATUS_WORDS:
             return "Monitoring system is operational. All security protocols are active."
-        elif "password" in prompt_lower or "login" in prompt_lower:
+        elif words & self._CREDENTIAL_WORDS:
             return "Credential security is critical. Ensure you're on legitimate sites and use strong, unique passwords."
-        elif "virus" in prompt_lower or "malware" in prompt_lower:
+        elif words & self._MALWARE_WORDS:
             return "No malware detected. Continue practicing safe browsing habits and keep software updated."
         else:
             return "AwakenSecurity AI ready. How can I assist with your security analysis?"
@@ -333,16 +562,42 @@ Keep response under 100 words. Be professional and technical."""
         }
     
     def log_event(self, message: str):
-        """Log an event to file"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] AI_AGENT: {message}\n"
-        
-        log_file = self.logs_dir / f"ai_agent_{datetime.now().strftime('%Y%m%d')}.log"
+        """Queue an event for the background log writer"""
+        _, ts, day = _now_strings()
+        self._log_q.put_nowait((day, f"[{ts}] AI_AGENT: {message}\n"))
+
+    def _log_writer(self):
+        """Drain queued log records into the current day's log file"""
+        log_f = None
+        current_day = None
+        last_flush = time.monotonic()
         try:
-            with open(log_file, 'a') as f:
-                f.write(log_entry)
-        except Exception as e:
-            print(f"Error writing to AI agent log: {e}")
+            while True:
+                try:
+                    day, line = self._log_q.get(timeout=0.5)
+                except queue.Empty:
+                    if log_f:
+                        log_f.flush()
+                        last_flush = time.monotonic()
+                    continue
+                try:
+                    if day != current_day:
+                        if log_f:
+                            log_f.close()
+                        log_f = open(self.logs_dir / f"ai_agent_{day}.log", 'a')
+                        current_day = day
+                    log_f.write(line)
+                    # Flush on the busy path too: a sustained burst never
+                    # reaches the idle branch, and the writer is a daemon
+                    # thread whose buffered lines die with the process
+                    if time.monotonic() - last_flush >= 0.5:
+                        log_f.flush()
+                        last_flush = time.monotonic()
+                except Exception as e:
+                    print(f"Error writing to AI agent log: {e}")
+        finally:
+            if log_f:
+                log_f.close()
 
 # Global AI agent instance
 ai_agent = AIAgent() 
@@ -1,7 +1,9 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from monitor import monitor
 from ai_agent import ai_agent
+import json
+import os
 import threading
 import time
 
@@ -54,7 +56,7 @@ def update_settings():
 def get_alerts():
     """Get recent alerts"""
     try:
-        alerts = monitor.alerts[-20:]  # Last 20 alerts
+        alerts = monitor.get_alerts_snapshot(20)  # Last 20 alerts
         return jsonify({"alerts": alerts})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -100,9 +102,60 @@ def chat_with_ai():
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/ai/chat/stream', methods=['POST'])
+def chat_with_ai_stream():
+    """Chat with the AI agent, streaming tokens as server-sent events"""
+    try:
+        data = request.json
+        if not data or 'message' not in data:
+            return jsonify({"success": False, "message": "Message is required"}), 400
+
+        def generate():
+            # JSON-encode each chunk: a raw newline in a token would break
+            # SSE framing (continuation lines without a data: prefix are
+            # dropped, and a blank line ends the event early)
+            for token in ai_agent.stream_chat(data['message']):
+                yield f"data: {json.dumps(token)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(stream_with_context(generate()), mimetype='text/event-stream')
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+# Set once the server socket is bound; an in-process launcher waits on
+# this directly instead of a pipe or HTTP probe
+ready = threading.Event()
+
+def _signal_ready():
+    """Mark the server ready: set the in-process event and write READY to
+    the launcher's readiness pipe, if one was inherited"""
+    ready.set()
+    fd = os.environ.get('AWAKEN_READY_FD')
+    if not fd:
+        return
+    try:
+        fd = int(fd)
+        os.write(fd, b"READY\n")
+        os.close(fd)
+    except (ValueError, OSError):
+        pass
+
 def run_server(host='0.0.0.0', port=5001):
-    """Run the Flask server"""
-    app.run(host=host, port=port, debug=False, threaded=True)
+    """Run the app under waitress (production WSGI server)"""
+    try:
+        from waitress.server import create_server
+    except ImportError:
+        # Dev fallback if waitress isn't installed; app.run never returns,
+        # so signal just before it binds
+        _signal_ready()
+        app.run(host=host, port=port, debug=False, threaded=True)
+        return
+    server = create_server(app, host=host, port=port, threads=8,
+                           connection_limit=200, channel_timeout=120)
+    # The listening socket is bound at this point, so the launcher can
+    # stop waiting as soon as the pipe becomes readable
+    _signal_ready()
+    server.run()
 
 if __name__ == '__main__':
     print("Starting AwakenSecurity API Server...")
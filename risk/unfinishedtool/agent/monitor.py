@@ -1,26 +1,62 @@
 import time
 import json
+import queue
+import re
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from mss import mss
 import pytesseract
-from datetime import datetime
 import os
 import sys
 from pathlib import Path
-from ai_agent import ai_agent
+# _now_strings is the shared per-second timestamp memo; one cache serves
+# both modules' alerts and log lines
+from ai_agent import ai_agent, _now_strings
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _count_rect_inputs(areas, verts):
+    """Count 4-vertex contours whose area fits an input-field footprint"""
+    count = 0
+    for i in range(areas.shape[0]):
+        if verts[i] == 4 and 100.0 < areas[i] < 10000.0:
+            count += 1
+    return count
+
+
+if njit is not None:
+    # cache=True persists the compiled code so restarts skip recompilation
+    _count_rect_inputs = njit(cache=True)(_count_rect_inputs)
+
 
 class SecurityMonitor:
     def __init__(self):
         self.is_running = False
         self.monitoring_thread = None
+        self._stop_event = threading.Event()
         self.sct = mss()
-        self.alerts = []
+        self._mon = self.sct.monitors[1]  # primary monitor, resolved once
+        # Bounded deque: O(1) append with automatic eviction of old alerts
+        self.alerts = deque(maxlen=100)
         self.last_activity = None
         self.monitoring_interval = 5  # seconds
         self.enable_ocr = True
         self.enable_ml = True
+        self._last_phash = None  # 64-bit perceptual hash of the last frame
+        # OCR and ML both release the GIL in their C extensions, so running
+        # them concurrently overlaps their work
+        self._pool = ThreadPoolExecutor(max_workers=2)
+        self._alerts_lock = threading.Lock()
+        # (alert_type, message) -> monotonic time of the last LLM enrichment
+        self._recent_llm = {}
+        self.llm_debounce_seconds = 30
         
         # Suspicious keywords for OCR detection
         self.suspicious_keywords = [
@@ -28,10 +64,27 @@ class SecurityMonitor:
             'bank account', 'routing number', 'pin', 'cvv', 'expiry',
             'username', 'email', 'phone', 'address', 'dob', 'birth'
         ]
-        
+        # Compiled once so the OCR text is scanned in a single pass instead
+        # of one substring search per keyword
+        self._kw_re = re.compile("|".join(re.escape(k) for k in self.suspicious_keywords))
+
+        # RapidOCR runs in-process on ONNX Runtime, avoiding the subprocess
+        # spawn and temp-file round trip pytesseract pays per frame; keep
+        # pytesseract as the fallback when it isn't installed
+        try:
+            from rapidocr_onnxruntime import RapidOCR
+            self._ocr = RapidOCR()
+        except ImportError:
+            self._ocr = None
+
         # Create logs directory
         self.logs_dir = Path(__file__).parent / 'logs'
         self.logs_dir.mkdir(exist_ok=True)
+
+        # Queue log records to a single background writer so alert bursts
+        # don't pay an open/write/close per line
+        self._log_q = queue.Queue()
+        threading.Thread(target=self._log_writer, daemon=True).start()
         
     def start_monitoring(self):
         """Start the monitoring process"""
@@ -39,6 +92,7 @@ class SecurityMonitor:
             return {"success": False, "message": "Monitoring already running"}
         
         self.is_running = True
+        self._stop_event.clear()
         self.monitoring_thread = threading.Thread(target=self._monitoring_loop)
         self.monitoring_thread.daemon = True
         self.monitoring_thread.start()
@@ -52,18 +106,29 @@ class SecurityMonitor:
             return {"success": False, "message": "Monitoring not running"}
         
         self.is_running = False
+        self._stop_event.set()
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=2)
         
         self.log_event("Monitoring stopped")
         return {"success": True, "message": "Monitoring stopped successfully"}
     
+    def get_alerts_snapshot(self, limit=None):
+        """Return a snapshot of recent alerts (newest last)
+
+        Iterating the deque while a pool thread appends raises
+        RuntimeError, so every reader takes the lock and copies.
+        """
+        with self._alerts_lock:
+            alerts = list(self.alerts)
+        return alerts if limit is None else alerts[-limit:]
+
     def get_status(self):
         """Get current monitoring status"""
         return {
             "isRunning": self.is_running,
             "lastActivity": self.last_activity,
-            "alerts": self.alerts[-10:],  # Last 10 alerts
+            "alerts": self.get_alerts_snapshot(10),  # Last 10 alerts
             "monitoringInterval": self.monitoring_interval,
             "enableOCR": self.enable_ocr,
             "enableML": self.enable_ml
@@ -71,50 +136,82 @@ class SecurityMonitor:
     
     def _monitoring_loop(self):
         """Main monitoring loop"""
-        while self.is_running:
+        # Event.wait doubles as the interval sleep and the shutdown signal,
+        # so stop_monitoring doesn't have to ride out a full sleep
+        while not self._stop_event.is_set():
             try:
                 self._capture_and_analyze()
-                time.sleep(self.monitoring_interval)
+                self._stop_event.wait(self.monitoring_interval)
             except Exception as e:
                 self.log_event(f"Error in monitoring loop: {str(e)}")
-                time.sleep(1)
+                self._stop_event.wait(1)
     
     def _capture_and_analyze(self):
         """Capture screen and analyze for security threats"""
         try:
-            # Capture screen
-            screenshot = self.sct.grab(self.sct.monitors[1])  # Primary monitor
-            img = np.array(screenshot)
-            
-            # Convert to RGB for processing
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGRA2RGB)
-            
-            # Update last activity
-            self.last_activity = datetime.now().isoformat()
-            
-            # Perform OCR if enabled
+            # Capture screen; wrap the raw BGRA buffer instead of copying
+            # it through np.array
+            shot = self.sct.grab(self._mon)
+            img = np.frombuffer(shot.bgra, np.uint8).reshape(shot.height, shot.width, 4)
+
+            # Convert BGRA to grayscale once; the change hash, OCR, and edge
+            # detection all consume this single-channel frame, avoiding the
+            # BGRA->RGB and RGB->GRAY passes that each touched the full frame
+            gray = cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+
+            # Update last activity before the change check: it's the
+            # liveness signal reported by /monitor/status and must keep
+            # ticking on an idle desktop even when analysis is skipped
+            self.last_activity = _now_strings()[0]
+
+            # Skip OCR/ML entirely when the screen hasn't changed: an 8x8
+            # mean-threshold perceptual hash is orders of magnitude cheaper
+            # than either analysis, and an idle desktop produces no new data
+            small = cv2.resize(gray, (8, 8), interpolation=cv2.INTER_AREA)
+            bits = np.packbits(small > small.mean())
+            phash = int.from_bytes(bits.tobytes(), 'big')
+            if self._last_phash is not None and bin(phash ^ self._last_phash).count('1') < 3:
+                return
+            self._last_phash = phash
+
+            # Downscale so the longest edge is at most 1600px; OCR and Canny
+            # both scale with pixel count and a 4K frame is 4x the work for
+            # no extra recall on normal-sized screen text
+            h, w = gray.shape[:2]
+            scale = min(1.0, 1600 / max(h, w))
+            if scale < 1.0:
+                img_proc = cv2.resize(
+                    gray, (int(w * scale), int(h * scale)),
+                    interpolation=cv2.INTER_AREA
+                )
+            else:
+                img_proc = gray
+
+            # Run the enabled analyses concurrently on the worker pool
+            futures = []
             if self.enable_ocr:
-                self._perform_ocr_analysis(img_rgb)
-            
-            # Perform ML analysis if enabled
+                futures.append(self._pool.submit(self._perform_ocr_analysis, img_proc))
             if self.enable_ml:
-                self._perform_ml_analysis(img_rgb)
+                futures.append(self._pool.submit(self._perform_ml_analysis, img_proc))
+            for future in futures:
+                future.result()
                 
         except Exception as e:
             self.log_event(f"Error capturing screen: {str(e)}")
     
-    def _perform_ocr_analysis(self, img):
-        """Perform OCR analysis on the captured image"""
+    def _perform_ocr_analysis(self, gray):
+        """Perform OCR analysis on the captured grayscale image"""
         try:
-            # Extract text from image
-            text = pytesseract.image_to_string(img).lower()
-            
-            # Check for suspicious keywords
-            found_keywords = []
-            for keyword in self.suspicious_keywords:
-                if keyword in text:
-                    found_keywords.append(keyword)
+            # Extract text from image (both engines accept single-channel input)
+            if self._ocr is not None:
+                result, _ = self._ocr(gray)
+                text = " ".join(r[1] for r in (result or [])).lower()
+            else:
+                text = pytesseract.image_to_string(gray).lower()
             
+            # Check for suspicious keywords in one pass over the text
+            found_keywords = sorted(set(self._kw_re.findall(text)))
+
             if found_keywords:
                 alert_msg = f"Potential sensitive data detected: {', '.join(found_keywords)}"
                 self._add_alert(alert_msg, "OCR_DETECTION")
@@ -122,31 +219,26 @@ class SecurityMonitor:
         except Exception as e:
             self.log_event(f"Error in OCR analysis: {str(e)}")
     
-    def _perform_ml_analysis(self, img):
-        """Perform basic ML analysis on the captured image"""
+    def _perform_ml_analysis(self, gray):
+        """Perform basic ML analysis on the captured grayscale image"""
         try:
-            # Convert to grayscale for analysis
-            gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-            
             # Basic edge detection to identify forms or input fields
             edges = cv2.Canny(gray, 50, 150)
             
             # Count potential form elements (rectangular shapes)
             contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Look for rectangular shapes that might be input fields
+
+            # Look for rectangular shapes that might be input fields; the
+            # numeric filter runs as a JIT-compiled loop over flat arrays
             potential_inputs = 0
-            for contour in contours:
-                # Approximate the contour to a polygon
-                epsilon = 0.02 * cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, epsilon, True)
-                
-                # If it's a rectangle (4 points), it might be an input field
-                if len(approx) == 4:
-                    area = cv2.contourArea(contour)
-                    if 100 < area < 10000:  # Reasonable size for input fields
-                        potential_inputs += 1
-            
+            if contours:
+                areas = np.array([cv2.contourArea(c) for c in contours], np.float32)
+                verts = np.array(
+                    [len(cv2.approxPolyDP(c, 0.02 * cv2.arcLength(c, True), True)) for c in contours],
+                    np.int32
+                )
+                potential_inputs = int(_count_rect_inputs(areas, verts))
+
             # Alert if many potential input fields detected
             if potential_inputs > 5:
                 alert_msg = f"Multiple potential input fields detected ({potential_inputs})"
@@ -158,17 +250,23 @@ class SecurityMonitor:
     def _add_alert(self, message, alert_type):
         """Add a new security alert"""
         alert = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_strings()[0],
             "message": message,
             "type": alert_type,
             "severity": "medium"
         }
         
-        self.alerts.append(alert)
+        with self._alerts_lock:
+            self.alerts.append(alert)
         self.log_event(f"ALERT: {message}")
         
-        # Process with AI agent for enhanced insights
-        if ai_agent.is_active:
+        # Process with AI agent for enhanced insights. A page that keeps
+        # matching the same keywords re-fires an identical alert every scan;
+        # debounce the enrichment (two LLM calls) per alert identity
+        key = (alert_type, message)
+        now = time.monotonic()
+        if ai_agent.is_active and now - self._recent_llm.get(key, -self.llm_debounce_seconds) >= self.llm_debounce_seconds:
+            self._recent_llm[key] = now
             try:
                 ml_result = {
                     "alert": alert,
@@ -183,22 +281,44 @@ class SecurityMonitor:
                     self.log_event(f"AI Analysis: {ai_analysis['analysis']}")
             except Exception as e:
                 self.log_event(f"AI processing failed: {str(e)}")
-        
-        # Keep only last 100 alerts
-        if len(self.alerts) > 100:
-            self.alerts = self.alerts[-100:]
-    
+
     def log_event(self, message):
-        """Log an event to file"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\n"
-        
-        log_file = self.logs_dir / f"monitor_{datetime.now().strftime('%Y%m%d')}.log"
+        """Queue an event for the background log writer"""
+        _, ts, day = _now_strings()
+        self._log_q.put_nowait((day, f"[{ts}] {message}\n"))
+
+    def _log_writer(self):
+        """Write queued records to the day's monitor log, rotating at midnight"""
+        log_f = None
+        current_day = None
+        last_flush = time.monotonic()
         try:
-            with open(log_file, 'a') as f:
-                f.write(log_entry)
-        except Exception as e:
-            print(f"Error writing to log: {e}")
+            while True:
+                try:
+                    day, line = self._log_q.get(timeout=0.5)
+                except queue.Empty:
+                    if log_f:
+                        log_f.flush()
+                        last_flush = time.monotonic()
+                    continue
+                try:
+                    if day != current_day:
+                        if log_f:
+                            log_f.close()
+                        log_f = open(self.logs_dir / f"monitor_{day}.log", 'a')
+                        current_day = day
+                    log_f.write(line)
+                    # Flush on the busy path too: a sustained burst never
+                    # reaches the idle branch, and the writer is a daemon
+                    # thread whose buffered lines die with the process
+                    if time.monotonic() - last_flush >= 0.5:
+                        log_f.flush()
+                        last_flush = time.monotonic()
+                except Exception as e:
+                    print(f"Error writing to log: {e}")
+        finally:
+            if log_f:
+                log_f.close()
     
     def update_settings(self, settings):
         """Update monitoring settings"""
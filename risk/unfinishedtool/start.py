@@ -4,56 +4,176 @@ AwakenSecurity Startup Script
 Starts both the Python monitoring service and the Electron app
 """
 
+import random
+import select
+import selectors
+import shutil
 import subprocess
 import sys
 import time
 import os
 import signal
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+class _SpawnedProcess:
+    """Minimal Popen-compatible handle for a child started via os.posix_spawn"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+            if pid == self.pid:
+                self.returncode = os.waitstatus_to_exitcode(status)
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+    def terminate(self):
+        if self.returncode is None:
+            os.kill(self.pid, signal.SIGTERM)
+
+    def kill(self):
+        if self.returncode is None:
+            os.kill(self.pid, signal.SIGKILL)
+
 class AppStarter:
     def __init__(self):
         self.python_process = None
         self.electron_process = None
         self.running = True
-        
+        self.in_process = False  # run the API in a thread instead of a child
+        self._api_module = None  # api_server module when running in-process
+        self._ready_fd = None
+        # Set from the SIGCHLD handler so monitor_processes wakes the
+        # moment a child dies instead of on its next poll tick
+        self._child_event = threading.Event()
+        # Set by the signal handlers; the main thread sleeps on it instead
+        # of waking once a second to check a flag
+        self._stop_event = threading.Event()
+        # Read end of the signal wakeup pipe (see run); the pidfd selector
+        # watches it so Ctrl+C interrupts the monitor select immediately
+        self._signal_r = None
+        # Monotonic time of the last successful readiness check; restarts
+        # within the TTL skip the redundant re-probe
+        self._last_ready_at = 0.0
+        # Crash-loop protection: per-child restart backoff plus a window
+        # of recent restart times for the circuit breaker
+        self._restart_delays = {'python': 1.0, 'electron': 1.0}
+        self._last_start = {'python': 0.0, 'electron': 0.0}
+        self._restart_times = deque(maxlen=10)
+        # Built once; restarts reuse it instead of re-copying os.environ
+        self._electron_env = {**os.environ, 'NODE_ENV': 'development'}
+        # Resolve paths and the npm executable up front: restarts skip the
+        # PATH search and directory stats, and a missing npm shows up at
+        # startup rather than on the first crash
+        self._py_dir = (Path(__file__).parent / "python-agent").resolve()
+        self._electron_dir = (Path(__file__).parent / "electron-app").resolve()
+        self._npm = shutil.which("npm") or "npm"
+
     def start_python_api(self):
         """Start the Python API server"""
         print("Starting Python monitoring API...")
-        python_dir = Path(__file__).parent / "python-agent"
-        
+        python_dir = self._py_dir
+
+        if self.in_process:
+            return self._start_python_api_inproc(python_dir)
+
+        # Readiness pipe: the API server writes "READY" once its socket is
+        # bound, so we can block on the fd instead of polling the health
+        # endpoint over HTTP
+        ready_r = ready_w = None
         try:
-            self.python_process = subprocess.Popen(
-                [sys.executable, "api_server.py"],
-                cwd=python_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            if os.name == 'posix':
+                ready_r, ready_w = os.pipe()
+                os.set_inheritable(ready_w, True)
+                # posix_spawn uses vfork internally, skipping the parent
+                # page-table copy a fork-based spawn pays. The script is
+                # passed by absolute path since posix_spawn has no cwd;
+                # api_server resolves its own paths from __file__. Route
+                # stdout/stderr to /dev/null in the child (nothing reads
+                # them, a full pipe buffer would block its writes)
+                pid = os.posix_spawn(
+                    sys.executable,
+                    [sys.executable, str(python_dir / "api_server.py")],
+                    {**os.environ, 'AWAKEN_READY_FD': str(ready_w)},
+                    file_actions=[
+                        (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0o644),
+                        (os.POSIX_SPAWN_DUP2, 1, 2),
+                    ],
+                )
+                self.python_process = _SpawnedProcess(pid)
+                os.close(ready_w)
+                if self._ready_fd is not None:
+                    os.close(self._ready_fd)
+                self._ready_fd = ready_r
+            else:
+                self.python_process = subprocess.Popen(
+                    [sys.executable, "api_server.py"],
+                    cwd=python_dir,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
             print(f"Python API started with PID: {self.python_process.pid}")
             return True
         except Exception as e:
+            if ready_r is not None:
+                os.close(ready_r)
+                os.close(ready_w)
             print(f"Failed to start Python API: {e}")
             return False
     
+    def _start_python_api_inproc(self, python_dir):
+        """Import api_server and serve it on a background thread
+
+        Skips the spawn and a second interpreter's stdlib imports
+        (~100ms and ~15MB RSS). Falls back to the subprocess path if the
+        API's dependencies can't be imported here.
+        """
+        if not (python_dir / "api_server.py").exists():
+            print(f"In-process API unavailable (no api_server.py in {python_dir}), "
+                  "using a subprocess")
+            self.in_process = False
+            return self.start_python_api()
+
+        try:
+            sys.path.insert(0, str(python_dir))
+            import api_server
+        except ImportError as e:
+            print(f"In-process API unavailable ({e}), using a subprocess")
+            self.in_process = False
+            return self.start_python_api()
+
+        # Serve on the port the probe and banner advertise; run_server's
+        # own default (5001) would leave the readiness wait timing out
+        self._api_module = api_server
+        threading.Thread(target=api_server.run_server,
+                         kwargs={'port': 5000}, daemon=True).start()
+        print("Python API running in-process")
+        return True
+
     def start_electron_app(self):
         """Start the Electron app"""
         print("Starting Electron app...")
-        electron_dir = Path(__file__).parent / "electron-app"
-        
+
         try:
-            # Set NODE_ENV for development
-            env = os.environ.copy()
-            env['NODE_ENV'] = 'development'
-            
             self.electron_process = subprocess.Popen(
-                ["npm", "run", "dev"],
-                cwd=electron_dir,
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                [self._npm, "run", "dev"],
+                cwd=self._electron_dir,
+                env=self._electron_env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             print(f"Electron app started with PID: {self.electron_process.pid}")
             return True
@@ -63,83 +183,292 @@ class AppStarter:
     
     def wait_for_python_api(self):
         """Wait for Python API to be ready"""
-        import requests
-        max_attempts = 30
-        attempt = 0
-        
         print("Waiting for Python API to be ready...")
-        while attempt < max_attempts and self.running:
+
+        if self._api_module is not None:
+            # In-process server: wait on its ready event directly, with no
+            # pipe or HTTP probe in the way
+            if self._api_module.ready.wait(30):
+                self._last_ready_at = time.monotonic()
+                print("Python API is ready!")
+                return True
+            print("Python API failed to start within 30 seconds")
+            return False
+
+        if self._ready_fd is not None:
+            # Block on the readiness pipe: unblocks the moment the server
+            # socket is bound, with no HTTP connections made
+            fd, self._ready_fd = self._ready_fd, None
             try:
-                response = requests.get("http://localhost:5000/health", timeout=1)
-                if response.status_code == 200:
+                readable, _, _ = select.select([fd], [], [], 30)
+                if readable and os.read(fd, 64):
+                    self._last_ready_at = time.monotonic()
                     print("Python API is ready!")
                     return True
-            except:
-                pass
-            
-            attempt += 1
-            time.sleep(1)
-        
+            finally:
+                os.close(fd)
+            print("Python API failed to start within 30 seconds")
+            return False
+
+        return self._wait_for_python_api_http()
+
+    def _wait_for_python_api_http(self):
+        """Poll the health endpoint; fallback when the pipe isn't available"""
+        # http.client instead of requests: same keep-alive connection
+        # reused across probes, without pulling in urllib3/certifi/idna
+        # (~30ms of imports and ~4MB RSS) for a loopback GET
+        import http.client
+        # 127.0.0.1 literal skips the localhost name resolution
+        # (nsswitch/DNS) that would otherwise run on every reconnect
+        conn = http.client.HTTPConnection("127.0.0.1", 5000, timeout=1)
+
+        # Exponential backoff: probe aggressively at first (the server is
+        # usually up within tens of ms) without hammering it for the full
+        # window; the monotonic deadline caps total wait at 30s
+        deadline = time.monotonic() + 30
+        delay = 0.02
+        try:
+            while time.monotonic() < deadline and self.running:
+                try:
+                    conn.request("GET", "/health")
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status == 200:
+                        self._last_ready_at = time.monotonic()
+                        print("Python API is ready!")
+                        return True
+                except Exception:
+                    conn.close()  # reconnect on the next attempt
+
+                time.sleep(delay)
+                delay = min(delay * 1.5, 0.5)
+        finally:
+            conn.close()
+
         print("Python API failed to start within 30 seconds")
         return False
     
+    def _on_sigchld(self, signum, frame):
+        """Wake the monitor thread when a child process exits"""
+        self._child_event.set()
+
+    def _restart_child(self, name, start_fn):
+        """Restart a dead child with backoff; trip the breaker on a crash loop"""
+        now = time.monotonic()
+        self._restart_times.append(now)
+        if sum(1 for t in self._restart_times if now - t < 60) > 5:
+            print("More than 5 restarts in the last minute, giving up")
+            self.running = False
+            self._stop_event.set()
+            return False
+
+        # A child that stayed up for 30s was healthy; start its backoff over
+        if now - self._last_start[name] > 30:
+            self._restart_delays[name] = 1.0
+        delay = self._restart_delays[name]
+        self._restart_delays[name] = min(delay * 2, 60.0)
+
+        time.sleep(delay + random.random() * 0.1)
+        self._last_start[name] = time.monotonic()
+        return start_fn()
+
+    def _handle_dead_python(self):
+        print("Python API process died, restarting...")
+        self._restart_child('python', self.start_python_api)
+        # Re-verify readiness only if the last confirmation is
+        # stale, so a restart storm can't amplify into a probe storm
+        if self.running and time.monotonic() - self._last_ready_at > 2.0:
+            self.wait_for_python_api()
+
+    def _handle_dead_electron(self):
+        print("Electron app process died, restarting...")
+        self._restart_child('electron', self.start_electron_app)
+
     def monitor_processes(self):
         """Monitor both processes and restart if needed"""
+        if hasattr(os, 'pidfd_open'):
+            try:
+                self._monitor_with_pidfds()
+                return
+            except OSError:
+                pass  # pidfd_open exists but the kernel refused it
+        self._monitor_by_polling()
+
+    def _monitor_with_pidfds(self):
+        """Block on child pidfds: a single select covers both children
+
+        A pidfd becomes readable when its process exits, so one blocking
+        syscall replaces polling both children and wakes within
+        milliseconds of a crash.
+        """
+        sel = selectors.DefaultSelector()
+        registered = {}  # name -> (pidfd, process the fd belongs to)
+
+        def sync(name, proc):
+            entry = registered.get(name)
+            if entry and entry[1] is proc:
+                return
+            if entry:
+                sel.unregister(entry[0])
+                os.close(entry[0])
+                del registered[name]
+            if proc is not None:
+                fd = os.pidfd_open(proc.pid)
+                sel.register(fd, selectors.EVENT_READ, data=name)
+                registered[name] = (fd, proc)
+
+        if self._signal_r is not None:
+            sel.register(self._signal_r, selectors.EVENT_READ, data='signal')
+
+        # With the signal wakeup fd in the set, the select can block
+        # indefinitely; without it, a 5s timeout bounds how long a stop
+        # request can go unnoticed
+        timeout = None if self._signal_r is not None else 5
+
+        try:
+            while self.running and not self._stop_event.is_set():
+                sync('python', self.python_process)
+                sync('electron', self.electron_process)
+                for key, _ in sel.select(timeout=timeout):
+                    if key.data == 'signal':
+                        # Drain the pipe; the handler already set the stop
+                        # event (or SIGCHLD fired, handled via the pidfds)
+                        try:
+                            os.read(self._signal_r, 64)
+                        except BlockingIOError:
+                            pass
+                        continue
+                    if not self.running:
+                        break
+                    if key.data == 'python':
+                        self.python_process.poll()
+                        self._handle_dead_python()
+                    else:
+                        self.electron_process.poll()
+                        self._handle_dead_electron()
+        finally:
+            for fd, _ in registered.values():
+                os.close(fd)
+            sel.close()
+
+    def _monitor_by_polling(self):
+        """Poll-based fallback for platforms without pidfd support"""
+        has_waitid = hasattr(os, 'waitid')
         while self.running:
-            # Check Python process
-            if self.python_process and self.python_process.poll() is not None:
-                print("Python API process died, restarting...")
-                self.start_python_api()
-            
-            # Check Electron process
-            if self.electron_process and self.electron_process.poll() is not None:
-                print("Electron app process died, restarting...")
-                self.start_electron_app()
-            
-            time.sleep(5)
+            if has_waitid:
+                # One waitid syscall covers every child instead of one
+                # waitpid per process; WNOWAIT leaves the exit status
+                # queued so the poll() below still reaps it
+                dead_pid = None
+                try:
+                    info = os.waitid(os.P_ALL, 0,
+                                     os.WEXITED | os.WNOHANG | os.WNOWAIT)
+                    if info is not None:
+                        dead_pid = info.si_pid
+                except ChildProcessError:
+                    pass
+
+                if self.python_process and dead_pid == self.python_process.pid:
+                    self.python_process.poll()
+                    self._handle_dead_python()
+                elif self.electron_process and dead_pid == self.electron_process.pid:
+                    self.electron_process.poll()
+                    self._handle_dead_electron()
+            else:
+                # Check Python process
+                if self.python_process and self.python_process.poll() is not None:
+                    self._handle_dead_python()
+
+                # Check Electron process
+                if self.electron_process and self.electron_process.poll() is not None:
+                    self._handle_dead_electron()
+
+            # SIGCHLD sets the event, so a crash is handled within
+            # milliseconds; the 5s timeout is a safety net for platforms
+            # without SIGCHLD (Windows)
+            self._child_event.wait(5)
+            self._child_event.clear()
     
     def cleanup(self):
         """Clean up processes on exit"""
         print("\nShutting down...")
         self.running = False
-        
-        if self.python_process:
-            print("Stopping Python API...")
-            self.python_process.terminate()
-            try:
-                self.python_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self.python_process.kill()
-        
-        if self.electron_process:
-            print("Stopping Electron app...")
-            self.electron_process.terminate()
+        self._stop_event.set()
+
+        procs = [("Python API", self.python_process),
+                 ("Electron app", self.electron_process)]
+        procs = [(name, p) for name, p in procs if p]
+
+        # Terminate both first, then wait on both in parallel: worst-case
+        # shutdown is one 5s grace period instead of two back to back
+        for name, proc in procs:
+            print(f"Stopping {name}...")
+            proc.terminate()
+
+        def wait_or_kill(proc):
             try:
-                self.electron_process.wait(timeout=5)
+                proc.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                self.electron_process.kill()
-        
+                proc.kill()
+
+        if procs:
+            with ThreadPoolExecutor(max_workers=len(procs)) as pool:
+                list(pool.map(wait_or_kill, (p for _, p in procs)))
+
         print("Cleanup complete")
     
+    def run_exec(self):
+        """Start the API, then replace this process with the Electron app
+
+        With no supervision to do, keeping a Python parent alive just to
+        sleep costs ~15MB RSS and a monitor thread. exec hands the process
+        over to npm entirely; restarts become the service manager's job.
+        """
+        if self.in_process:
+            # An in-process API thread would die with the exec below;
+            # force the subprocess path so the API outlives the handoff
+            print("--in-process is incompatible with --no-supervise, "
+                  "starting the API as a subprocess")
+            self.in_process = False
+
+        if not self.start_python_api():
+            return False
+        if not self.wait_for_python_api():
+            return False
+
+        os.chdir(self._electron_dir)
+        os.execvpe(self._npm, ["npm", "run", "dev"], self._electron_env)
+
     def run(self):
         """Main run method"""
-        # Set up signal handlers
-        signal.signal(signal.SIGINT, lambda s, f: self.cleanup())
-        signal.signal(signal.SIGTERM, lambda s, f: self.cleanup())
+        # Signal handlers only flag the stop event; cleanup runs on the
+        # main thread once the wait below returns
+        signal.signal(signal.SIGINT, lambda s, f: self._stop_event.set())
+        signal.signal(signal.SIGTERM, lambda s, f: self._stop_event.set())
+        if hasattr(signal, 'SIGCHLD'):
+            signal.signal(signal.SIGCHLD, self._on_sigchld)
+        if os.name == 'posix':
+            # Self-pipe wakeup: any signal writes a byte here, letting the
+            # monitor's selector wake on signals and child exits alike
+            sig_r, sig_w = os.pipe()
+            os.set_blocking(sig_r, False)
+            os.set_blocking(sig_w, False)
+            signal.set_wakeup_fd(sig_w)
+            self._signal_r = sig_r
         
         try:
-            # Start Python API
-            if not self.start_python_api():
-                return False
-            
-            # Wait for Python API to be ready
-            if not self.wait_for_python_api():
-                return False
-            
-            # Start Electron app
-            if not self.start_electron_app():
-                return False
-            
+            # Start the Python API and the Electron dev build in parallel:
+            # the npm build is CPU-heavy and independent of the API being
+            # up, so serializing them just adds their latencies together
+            def bring_up_python():
+                return self.start_python_api() and self.wait_for_python_api()
+
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                python_future = pool.submit(bring_up_python)
+                electron_future = pool.submit(self.start_electron_app)
+                if not python_future.result() or not electron_future.result():
+                    return False
+
             # Start monitoring thread
             monitor_thread = threading.Thread(target=self.monitor_processes, daemon=True)
             monitor_thread.start()
@@ -151,10 +480,13 @@ class AppStarter:
             print("Press Ctrl+C to stop")
             print("="*50 + "\n")
             
-            # Keep main thread alive
-            while self.running:
-                time.sleep(1)
-                
+            # Sleep until a signal (or the circuit breaker) asks us to stop
+            while self.running and not self._stop_event.is_set():
+                # Blocks indefinitely on POSIX; the 1s timeout keeps Ctrl+C
+                # responsive on Windows, where Event.wait isn't interrupted
+                # by signals
+                self._stop_event.wait(None if os.name == 'posix' else 1)
+
         except KeyboardInterrupt:
             pass
         finally:
@@ -163,9 +495,16 @@ class AppStarter:
 def main():
     """Main entry point"""
     print("AwakenSecurity Startup Script")
-    print("Starting both Python monitoring service and Electron app...")
-    
+
     starter = AppStarter()
+    if "--in-process" in sys.argv[1:]:
+        starter.in_process = True
+    if "--no-supervise" in sys.argv[1:]:
+        print("Starting without supervision (exec into Electron)...")
+        starter.run_exec()
+        return
+
+    print("Starting both Python monitoring service and Electron app...")
     starter.run()
 
 if __name__ == "__main__":